@@ -0,0 +1,259 @@
+# bot/backup.py
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+from config import BACKUP_DIR as _BACKUP_DIR_SETTING, BACKUP_INTERVAL_MINUTES, BACKUP_KEEP
+from .db import DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# По умолчанию бэкапы лежат рядом с базой: в проде это volume ./data,
+# так что они переживают пересоздание контейнера
+BACKUP_DIR = _BACKUP_DIR_SETTING or os.path.join(os.path.dirname(DB_PATH), "backups")
+
+# Сколько страниц копировать за один шаг backup API и сколько спать между шагами.
+# Между шагами sqlite отпускает блокировку, и бот спокойно пишет в базу.
+BACKUP_PAGES_PER_STEP = 64
+BACKUP_STEP_SLEEP = 0.01
+
+BACKUP_PREFIX = "db-"
+BACKUP_SUFFIX = ".sqlite.gz"
+
+# ======================
+# Низкоуровневые операции (выполняются в отдельном потоке)
+# ======================
+
+def _connect_readonly(db_path: str) -> sqlite3.Connection:
+    # Обычный connect() молча создаёт пустую базу, если файла нет.
+    # Открываем только на чтение, чтобы ошибка в пути не превращалась в "пустой бэкап".
+    if not os.path.isfile(db_path):
+        raise FileNotFoundError(f"База {db_path} не найдена")
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True)
+
+def _online_copy(src_path: str, dst_path: str) -> None:
+    """
+    Копирует базу через sqlite online backup API маленькими шагами.
+    Если база меняется во время копирования, sqlite сам перезапускает шаги,
+    так что в итоге получается согласованный снимок.
+    """
+    src = _connect_readonly(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        dst.close()
+        src.close()
+
+def _integrity_ok(db_path: str) -> bool:
+    try:
+        conn = _connect_readonly(db_path)
+    except (OSError, sqlite3.DatabaseError):
+        return False
+    try:
+        row = conn.execute("PRAGMA integrity_check").fetchone()
+        return row is not None and row[0] == "ok"
+    except sqlite3.DatabaseError:
+        # Например, в архиве вообще не sqlite-файл
+        return False
+    finally:
+        conn.close()
+
+def _gzip_file(src_path: str, dst_path: str) -> None:
+    with open(src_path, "rb") as f_in, gzip.open(dst_path, "wb", compresslevel=6) as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+def _gunzip_file(src_path: str, dst_path: str) -> None:
+    with gzip.open(src_path, "rb") as f_in, open(dst_path, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+
+def _unpack_verified(backup_path: str, dst_path: str) -> bool:
+    """
+    Распаковывает бэкап и проверяет его. Битый/обрезанный архив
+    или не-sqlite внутри дают False, а не исключение.
+    """
+    try:
+        _gunzip_file(backup_path, dst_path)
+    except (OSError, EOFError):
+        return False
+    return _integrity_ok(dst_path)
+
+def _create_backup_sync(db_path: str, backup_dir: str) -> Path:
+    out_dir = Path(backup_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    target = out_dir / f"{BACKUP_PREFIX}{stamp}{BACKUP_SUFFIX}"
+
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp_dir:
+        snapshot = os.path.join(tmp_dir, "snapshot.sqlite")
+        _online_copy(db_path, snapshot)
+        if not _integrity_ok(snapshot):
+            raise RuntimeError("Снимок базы не прошёл integrity_check")
+
+        # Пишем во временный файл и только потом переименовываем,
+        # чтобы в папке бэкапов никогда не было недописанного архива
+        packed = os.path.join(tmp_dir, target.name)
+        _gzip_file(snapshot, packed)
+        os.replace(packed, target)
+
+    return target
+
+def _list_backups_sync(backup_dir: str) -> List[Path]:
+    out_dir = Path(backup_dir)
+    if not out_dir.is_dir():
+        return []
+    # Имя содержит время в формате YYYYmmdd-HHMMSS, поэтому сортировка по имени = по времени
+    return sorted(out_dir.glob(f"{BACKUP_PREFIX}*{BACKUP_SUFFIX}"))
+
+def _rotate_sync(backup_dir: str, keep: int) -> List[Path]:
+    backups = _list_backups_sync(backup_dir)
+    if keep <= 0 or len(backups) <= keep:
+        return []
+    removed = backups[:-keep]
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+def _verify_backup_sync(backup_path: str) -> bool:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        unpacked = os.path.join(tmp_dir, "verify.sqlite")
+        return _unpack_verified(backup_path, unpacked)
+
+def _restore_backup_sync(backup_path: str, db_path: str) -> None:
+    db_dir = os.path.dirname(os.path.abspath(db_path))
+    with tempfile.TemporaryDirectory(dir=db_dir) as tmp_dir:
+        unpacked = os.path.join(tmp_dir, "restore.sqlite")
+        if not _unpack_verified(backup_path, unpacked):
+            raise RuntimeError(f"Бэкап {backup_path} повреждён, восстановление отменено")
+
+        # Заливаем снимок в рабочую базу тем же backup API:
+        # так корректно перезаписываются и файл базы, и её журнал
+        _online_copy(unpacked, db_path)
+
+    if not _integrity_ok(db_path):
+        raise RuntimeError("База после восстановления не прошла integrity_check")
+
+# ======================
+# Async-обёртки для бота
+# ======================
+
+async def create_backup(
+    db_path: str = DB_PATH,
+    backup_dir: str = BACKUP_DIR,
+    keep: int = BACKUP_KEEP
+) -> Path:
+    """
+    Делает сжатый снимок базы и удаляет старые, оставляя `keep` последних.
+    Вся работа идёт в отдельном потоке, event loop бота не блокируется.
+    Если снимок сделать не удалось, исключение пробрасывается и старые бэкапы не трогаются.
+    """
+    target = await asyncio.to_thread(_create_backup_sync, db_path, backup_dir)
+    removed = await asyncio.to_thread(_rotate_sync, backup_dir, keep)
+    for path in removed:
+        logger.info("Удалён старый бэкап %s", path)
+    return target
+
+async def list_backups(backup_dir: str = BACKUP_DIR) -> List[Path]:
+    return await asyncio.to_thread(_list_backups_sync, backup_dir)
+
+async def verify_backup(backup_path: str) -> bool:
+    return await asyncio.to_thread(_verify_backup_sync, backup_path)
+
+async def restore_backup(backup_path: str, db_path: str = DB_PATH) -> None:
+    """
+    Восстанавливает базу из бэкапа. Бота лучше остановить на время восстановления.
+    """
+    await asyncio.to_thread(_restore_backup_sync, backup_path, db_path)
+
+async def backup_loop(interval_minutes: int = BACKUP_INTERVAL_MINUTES) -> None:
+    """
+    Фоновая задача: раз в `interval_minutes` делает бэкап.
+    Ошибки логируются, но не роняют бота.
+    """
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            target = await create_backup()
+            logger.info("Бэкап сохранён: %s", target)
+        except Exception:
+            logger.exception("Не удалось сделать бэкап базы")
+
+# ======================
+# CLI: python -m bot.backup <команда>
+# ======================
+
+def _latest_backup_path(backup_dir: str) -> Optional[Path]:
+    backups = _list_backups_sync(backup_dir)
+    return backups[-1] if backups else None
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bot.backup",
+        description="Бэкапы sqlite-базы бота"
+    )
+    parser.add_argument("--dir", default=BACKUP_DIR, help="папка с бэкапами")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_create = sub.add_parser("create", help="сделать бэкап сейчас")
+    p_create.add_argument("--keep", type=int, default=BACKUP_KEEP, help="сколько бэкапов хранить")
+
+    sub.add_parser("list", help="показать бэкапы")
+
+    p_verify = sub.add_parser("verify", help="проверить бэкап (по умолчанию последний)")
+    p_verify.add_argument("file", nargs="?")
+
+    p_restore = sub.add_parser("restore", help="восстановить базу из бэкапа (по умолчанию последний)")
+    p_restore.add_argument("file", nargs="?")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        try:
+            target = asyncio.run(create_backup(backup_dir=args.dir, keep=args.keep))
+        except (OSError, RuntimeError, sqlite3.DatabaseError) as e:
+            print(f"Бэкап не сделан: {e}")
+            return 1
+        print(f"Бэкап сохранён: {target}")
+        return 0
+
+    if args.command == "list":
+        backups = _list_backups_sync(args.dir)
+        if not backups:
+            print("Бэкапов пока нет.")
+        for path in backups:
+            print(f"{path}  {path.stat().st_size} байт")
+        return 0
+
+    backup_path = args.file or _latest_backup_path(args.dir)
+    if backup_path is None:
+        print("Бэкапов пока нет.")
+        return 1
+
+    if args.command == "verify":
+        if asyncio.run(verify_backup(str(backup_path))):
+            print(f"{backup_path}: ok")
+            return 0
+        print(f"{backup_path}: повреждён")
+        return 1
+
+    # restore
+    try:
+        asyncio.run(restore_backup(str(backup_path)))
+    except (OSError, RuntimeError, sqlite3.DatabaseError) as e:
+        print(f"Восстановление не выполнено: {e}")
+        return 1
+    print(f"База {DB_PATH} восстановлена из {backup_path}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(cli())
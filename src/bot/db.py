@@ -31,15 +31,63 @@ CREATE TABLE IF NOT EXISTS contacts (
     category_id INTEGER NOT NULL,
     display_name TEXT NOT NULL,
     contact_value TEXT NOT NULL,
+    search_name TEXT NOT NULL DEFAULT '',
     FOREIGN KEY(category_id) REFERENCES categories(id) ON DELETE CASCADE
 );
 """
 
+# Поиск по префиксу имени в inline-режиме: категории пользователя берутся
+# из UNIQUE(owner_user_id, name), а внутри категории работает этот индекс.
+# Создаётся после миграции, потому что в старых базах колонки search_name нет.
+CREATE_INDEXES_SQL = """
+DROP INDEX IF EXISTS idx_contacts_category_name;
+
+CREATE INDEX IF NOT EXISTS idx_contacts_category_search_name
+    ON contacts(category_id, search_name);
+"""
+
+def fold_name(text: str) -> str:
+    """
+    Нормализует имя для поиска без учёта регистра.
+    lower()/NOCASE в sqlite понимают только латиницу, поэтому сворачиваем в Python.
+    """
+    return text.casefold().replace("ё", "е")
+
+async def _migrate_search_name(db: aiosqlite.Connection) -> None:
+    cursor = await db.execute("PRAGMA table_info(contacts)")
+    columns = [r[1] for r in await cursor.fetchall()]
+    if "search_name" in columns:
+        return
+
+    await db.execute(
+        "ALTER TABLE contacts ADD COLUMN search_name TEXT NOT NULL DEFAULT ''"
+    )
+    cursor = await db.execute("SELECT id, display_name FROM contacts")
+    rows = await cursor.fetchall()
+    await db.executemany(
+        "UPDATE contacts SET search_name = ? WHERE id = ?",
+        [(fold_name(display_name), contact_id) for contact_id, display_name in rows]
+    )
+
 async def init_db():
     async with aiosqlite.connect(DB_PATH) as db:
         await db.executescript(CREATE_TABLES_SQL)
+        await _migrate_search_name(db)
+        await db.executescript(CREATE_INDEXES_SQL)
         await db.commit()
 
+async def warm_up():
+    """
+    Прогревает страницы базы в кэше ОС, чтобы первые запросы пользователей
+    не ждали чтения с диска после рестарта контейнера.
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        await db.execute("SELECT COUNT(*) FROM categories")
+        await db.execute(
+            "SELECT COUNT(*) FROM contacts INDEXED BY idx_contacts_category_search_name"
+        )
+        await db.execute("SELECT COUNT(*) FROM contacts NOT INDEXED")
+
 async def ensure_user(telegram_user_id: int):
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(
@@ -133,10 +181,10 @@ async def add_contact_in_category(
     async with aiosqlite.connect(DB_PATH) as db:
         await db.execute(
             """
-            INSERT INTO contacts (category_id, display_name, contact_value)
-            VALUES (?, ?, ?)
+            INSERT INTO contacts (category_id, display_name, contact_value, search_name)
+            VALUES (?, ?, ?, ?)
             """,
-            (category_id, display_name, contact_value)
+            (category_id, display_name, contact_value, fold_name(display_name))
         )
         await db.commit()
 
@@ -170,3 +218,131 @@ async def remove_contact_in_category(
         )
         await db.commit()
         return cursor.rowcount > 0
+
+async def list_contacts_with_ids(
+    category_id: int
+) -> List[Tuple[int, str, str]]:
+    """
+    Возвращает список (id, display_name, contact_value) — нужен для
+    множественного выбора, где контакт адресуется по id.
+    """
+    async with aiosqlite.connect(DB_PATH) as db:
+        cursor = await db.execute(
+            """
+            SELECT id, display_name, contact_value
+            FROM contacts
+            WHERE category_id = ?
+            ORDER BY display_name ASC
+            """,
+            (category_id,)
+        )
+        rows = await cursor.fetchall()
+        return [(r[0], r[1], r[2]) for r in rows]
+
+async def delete_contacts_bulk(
+    user_id: int,
+    category_id: int,
+    contact_ids: List[int]
+) -> int:
+    """
+    Удаляет сразу несколько контактов категории одним запросом.
+    Возвращает количество удалённых строк.
+    """
+    if not contact_ids:
+        return 0
+    placeholders = ", ".join("?" for _ in contact_ids)
+    async with aiosqlite.connect(DB_PATH) as db:
+        cursor = await db.execute(
+            f"""
+            DELETE FROM contacts
+            WHERE category_id = ?
+              AND id IN ({placeholders})
+              AND EXISTS (
+                  SELECT 1 FROM categories
+                  WHERE id = ? AND owner_user_id = ?
+              )
+            """,
+            (category_id, *contact_ids, category_id, user_id)
+        )
+        await db.commit()
+        return cursor.rowcount
+
+async def move_contacts_bulk(
+    user_id: int,
+    from_category_id: int,
+    to_category_id: int,
+    contact_ids: List[int]
+) -> int:
+    """
+    Переносит сразу несколько контактов в другую категорию одним запросом.
+    Обе категории должны принадлежать пользователю.
+    Возвращает количество перенесённых строк.
+    """
+    if not contact_ids:
+        return 0
+    placeholders = ", ".join("?" for _ in contact_ids)
+    async with aiosqlite.connect(DB_PATH) as db:
+        cursor = await db.execute(
+            f"""
+            UPDATE contacts
+            SET category_id = ?
+            WHERE category_id = ?
+              AND id IN ({placeholders})
+              AND (
+                  SELECT COUNT(*) FROM categories
+                  WHERE id IN (?, ?) AND owner_user_id = ?
+              ) = 2
+            """,
+            (
+                to_category_id,
+                from_category_id,
+                *contact_ids,
+                from_category_id,
+                to_category_id,
+                user_id,
+            )
+        )
+        await db.commit()
+        return cursor.rowcount
+
+async def search_contacts_by_prefix(
+    user_id: int,
+    prefix: str,
+    limit: int,
+    offset: int = 0
+) -> List[Tuple[int, str, str, str]]:
+    """
+    Ищет контакты пользователя, чьё имя начинается с `prefix` (без учёта
+    регистра). Возвращает (id, display_name, contact_value, category_name).
+    """
+    prefix = fold_name(prefix)
+    async with aiosqlite.connect(DB_PATH) as db:
+        if prefix:
+            # Диапазон вместо LIKE, чтобы sqlite мог использовать индекс
+            cursor = await db.execute(
+                """
+                SELECT c.id, c.display_name, c.contact_value, cat.name
+                FROM categories AS cat
+                JOIN contacts AS c ON c.category_id = cat.id
+                WHERE cat.owner_user_id = ?
+                  AND c.search_name >= ?
+                  AND c.search_name < ?
+                ORDER BY c.search_name, c.id
+                LIMIT ? OFFSET ?
+                """,
+                (user_id, prefix, prefix + "\U0010ffff", limit, offset)
+            )
+        else:
+            cursor = await db.execute(
+                """
+                SELECT c.id, c.display_name, c.contact_value, cat.name
+                FROM categories AS cat
+                JOIN contacts AS c ON c.category_id = cat.id
+                WHERE cat.owner_user_id = ?
+                ORDER BY c.search_name, c.id
+                LIMIT ? OFFSET ?
+                """,
+                (user_id, limit, offset)
+            )
+        rows = await cursor.fetchall()
+        return [(r[0], r[1], r[2], r[3]) for r in rows]
@@ -1,4 +1,8 @@
 import asyncio
+import logging
+
+# startup импортируем первым: с этого момента считается фаза import
+from . import startup
 from aiogram import Bot, Dispatcher, Router, F
 from aiogram.filters import Command
 from aiogram.types import (
@@ -6,17 +10,25 @@ from aiogram.types import (
     CallbackQuery,
     InlineKeyboardMarkup,
     InlineKeyboardButton,
+    InlineQuery,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
 )
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import GetUpdates
 
-from config import BOT_TOKEN
+from config import BOT_TOKEN, BACKUP_INTERVAL_MINUTES, READY_FILE
 from . import db
 from . import storage
-from .states import CreateCategory, AddContact
+from .states import CreateCategory, AddContact, SelectContacts
 
 router = Router()
 
+# Сколько секунд Telegram может сам кэшировать ответ на inline-запрос.
+# Держим маленьким, чтобы свежие контакты быстро появлялись в поиске.
+INLINE_CACHE_TIME = 5
+
 # ======================
 # Клавиатуры
 # ======================
@@ -99,6 +111,46 @@ def delete_contact_kb(cat_id: int, contacts: list[tuple[str, str]]) -> InlineKey
                 callback_data=f"delc:{cat_id}:{display_name}"
             )
         ])
+    rows.append([
+        InlineKeyboardButton(
+            text="☑ Выбрать несколько",
+            callback_data=f"cat:{cat_id}:select"
+        )
+    ])
+    rows.append([
+        InlineKeyboardButton(
+            text="⬅ Назад",
+            callback_data=f"cat:{cat_id}"
+        )
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+def select_contacts_kb(
+    cat_id: int,
+    contacts: list[tuple[int, str]],
+    selected: set[int]
+) -> InlineKeyboardMarkup:
+    rows = []
+    for contact_id, display_name in contacts:
+        mark = "✅" if contact_id in selected else "⬜"
+        rows.append([
+            InlineKeyboardButton(
+                text=f"{mark} {display_name}",
+                callback_data=f"sel:{cat_id}:t:{contact_id}"
+            )
+        ])
+    rows.append([
+        InlineKeyboardButton(
+            text=f"🗑 Удалить выбранные ({len(selected)})",
+            callback_data=f"sel:{cat_id}:del"
+        )
+    ])
+    rows.append([
+        InlineKeyboardButton(
+            text="📁 Переместить в категорию",
+            callback_data=f"sel:{cat_id}:move"
+        )
+    ])
     rows.append([
         InlineKeyboardButton(
             text="⬅ Назад",
@@ -107,6 +159,25 @@ def delete_contact_kb(cat_id: int, contacts: list[tuple[str, str]]) -> InlineKey
     ])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
+def move_target_kb(cat_id: int, categories: list[tuple[int, str]]) -> InlineKeyboardMarkup:
+    rows = []
+    for target_id, name in categories:
+        if target_id == cat_id:
+            continue
+        rows.append([
+            InlineKeyboardButton(
+                text=f"📁 {name}",
+                callback_data=f"sel:{cat_id}:to:{target_id}"
+            )
+        ])
+    rows.append([
+        InlineKeyboardButton(
+            text="⬅ Назад к выбору",
+            callback_data=f"sel:{cat_id}:back"
+        )
+    ])
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
 def confirm_delete_category_kb(cat_id: int, cat_name: str) -> InlineKeyboardMarkup:
     rows = [
         [
@@ -232,6 +303,7 @@ async def fsm_create_category_name(message: Message, state: FSMContext):
 #   cat:<id>:contacts
 #   cat:<id>:addcontact
 #   cat:<id>:delcontact
+#   cat:<id>:select
 #   cat:<id>:rmcat
 # ======================
 
@@ -314,6 +386,33 @@ async def cb_category_any(callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         return
 
+    # select -> режим множественного выбора, выбор хранится в FSM data
+    if action == "select":
+        contacts = await storage.list_contacts_with_ids(cat_id)
+        if not contacts:
+            await state.clear()
+            await callback.message.edit_text(
+                f"В '{cat_name}' пока нет контактов.",
+                reply_markup=category_menu_kb(cat_id, cat_name)
+            )
+            await callback.answer()
+            return
+
+        short_contacts = [[contact_id, name] for contact_id, name, _ in contacts]
+        await state.set_state(SelectContacts.selecting)
+        await state.set_data({
+            "category_id": cat_id,
+            "cat_name": cat_name,
+            "contacts": short_contacts,
+            "selected": [],
+        })
+        await callback.message.edit_text(
+            f"Отметь контакты в '{cat_name}' и выбери действие:",
+            reply_markup=select_contacts_kb(cat_id, short_contacts, set())
+        )
+        await callback.answer()
+        return
+
     # rmcat -> запросить подтверждение удаления категории
     if action == "rmcat":
         await state.clear()
@@ -419,6 +518,126 @@ async def cb_delete_contact(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.answer()
 
+# ======================
+# Множественный выбор контактов
+# callback_data:
+#   sel:<cat_id>:t:<contact_id>   — отметить / снять отметку
+#   sel:<cat_id>:del              — удалить выбранные
+#   sel:<cat_id>:move             — выбрать категорию для переноса
+#   sel:<cat_id>:to:<target_id>   — перенести выбранные
+#   sel:<cat_id>:back             — вернуться к выбору
+# ======================
+
+@router.callback_query(F.data.startswith("sel:"))
+async def cb_select_contacts(callback: CallbackQuery, state: FSMContext):
+    user_id = callback.from_user.id
+    await storage.setup_user(user_id)
+
+    parts = callback.data.split(":")
+    if len(parts) < 3:
+        await callback.answer("Некорректные данные", show_alert=True)
+        return
+
+    try:
+        cat_id = int(parts[1])
+    except ValueError:
+        await callback.answer("Некорректные данные", show_alert=True)
+        return
+
+    data = await state.get_data()
+    # Выбор живёт только в FSM; после рестарта бота или ухода из меню он теряется
+    if await state.get_state() != SelectContacts.selecting.state or data.get("category_id") != cat_id:
+        await callback.answer("Выбор устарел, открой категорию заново", show_alert=True)
+        return
+
+    cat_name = data["cat_name"]
+    contacts = data["contacts"]
+    selected = set(data["selected"])
+    action = parts[2]
+
+    if action == "t":
+        try:
+            contact_id = int(parts[3])
+        except (IndexError, ValueError):
+            await callback.answer("Некорректные данные", show_alert=True)
+            return
+
+        if contact_id in selected:
+            selected.discard(contact_id)
+        else:
+            selected.add(contact_id)
+        await state.update_data(selected=sorted(selected))
+
+        # Перерисовываем только клавиатуру, без похода в базу
+        await callback.message.edit_reply_markup(
+            reply_markup=select_contacts_kb(cat_id, contacts, selected)
+        )
+        await callback.answer()
+        return
+
+    if action == "back":
+        await callback.message.edit_text(
+            f"Отметь контакты в '{cat_name}' и выбери действие:",
+            reply_markup=select_contacts_kb(cat_id, contacts, selected)
+        )
+        await callback.answer()
+        return
+
+    if not selected:
+        await callback.answer("Сначала отметь хотя бы один контакт", show_alert=True)
+        return
+
+    if action == "del":
+        resp = await storage.remove_contacts(user_id, cat_id, cat_name, sorted(selected))
+        await state.clear()
+        await callback.message.edit_text(
+            f"{resp}\n\nКатегория: {cat_name}",
+            reply_markup=category_menu_kb(cat_id, cat_name)
+        )
+        await callback.answer()
+        return
+
+    if action == "move":
+        cats = await storage.get_categories_full(user_id)
+        targets = [[target_id, name] for target_id, name in cats if target_id != cat_id]
+        if not targets:
+            await callback.answer("Нет другой категории для переноса", show_alert=True)
+            return
+
+        await state.update_data(targets=targets)
+        await callback.message.edit_text(
+            f"Куда перенести выбранные контакты ({len(selected)})?",
+            reply_markup=move_target_kb(cat_id, targets)
+        )
+        await callback.answer()
+        return
+
+    if action == "to":
+        try:
+            target_id = int(parts[3])
+        except (IndexError, ValueError):
+            await callback.answer("Некорректные данные", show_alert=True)
+            return
+
+        target_names = {t_id: name for t_id, name in data.get("targets", [])}
+        target_name = target_names.get(target_id)
+        if target_name is None:
+            await callback.answer("Категория не найдена", show_alert=True)
+            return
+
+        resp = await storage.move_contacts(
+            user_id, cat_id, target_id, target_name, sorted(selected)
+        )
+        await state.clear()
+        await callback.message.edit_text(
+            f"{resp}\n\nКатегория: {cat_name}",
+            reply_markup=category_menu_kb(cat_id, cat_name)
+        )
+        await callback.answer()
+        return
+
+    await callback.answer("Неизвестное действие", show_alert=True)
+
 # ======================
 # Удаление категории целиком
 # callback_data:
@@ -463,18 +682,102 @@ async def cb_delete_category(callback: CallbackQuery, state: FSMContext):
     )
     await callback.answer()
 
+# ======================
+# Inline-режим: @bot <начало имени>
+# Ищет по контактам того, кто печатает запрос
+# ======================
+
+@router.inline_query()
+async def inline_search_contacts(inline_query: InlineQuery):
+    user_id = inline_query.from_user.id
+
+    try:
+        offset = int(inline_query.offset) if inline_query.offset else 0
+    except ValueError:
+        offset = 0
+
+    rows, has_more = await storage.search_contacts(user_id, inline_query.query, offset)
+
+    results = [
+        InlineQueryResultArticle(
+            id=str(contact_id),
+            title=display_name,
+            description=f"{contact_value} · {cat_name}",
+            input_message_content=InputTextMessageContent(
+                message_text=f"{display_name}: {contact_value}"
+            ),
+        )
+        for contact_id, display_name, contact_value, cat_name in rows
+    ]
+
+    # is_personal: у каждого пользователя свои контакты, общий кэш Telegram недопустим
+    await inline_query.answer(
+        results,
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=str(offset + len(rows)) if has_more else "",
+    )
+
 # ======================
 # RUN
 # ======================
 
 async def main():
-    await db.init_db()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    profile = startup.StartupProfile(READY_FILE)
+    profile.clear_ready()
+    profile.point("import")
 
     bot = Bot(token=BOT_TOKEN)
     dp = Dispatcher(storage=MemoryStorage())
     dp.include_router(router)
 
-    await dp.start_polling(bot)
+    # Миграция и прогрев базы идут параллельно с getMe / первым getUpdates.
+    # Апдейты до окончания миграции просто ждут её в middleware ниже.
+    db_ready = asyncio.Event()
+
+    async def prepare_db():
+        async with profile.phase("migrate"):
+            await db.init_db()
+        db_ready.set()
+        async with profile.phase("warm"):
+            await db.warm_up()
+
+    async def wait_db_ready(handler, event, data):
+        if not db_ready.is_set():
+            await db_ready.wait()
+        try:
+            return await handler(event, data)
+        finally:
+            # Отмечаем и неудачный первый апдейт, иначе замер просто пропадёт
+            profile.point("first_update")
+
+    async def track_polling(make_request, bot, method):
+        if isinstance(method, GetUpdates):
+            profile.point("polling")
+        return await make_request(bot, method)
+
+    dp.update.outer_middleware(wait_db_ready)
+    bot.session.middleware(track_polling)
+
+    # Фоновые бэкапы базы (если включены в конфиге).
+    # Модуль тянет argparse/gzip/tempfile, поэтому импортируем только когда нужен.
+    backup_task = None
+    if BACKUP_INTERVAL_MINUTES > 0:
+        from . import backup
+        backup_task = asyncio.create_task(backup.backup_loop(BACKUP_INTERVAL_MINUTES))
+
+    try:
+        # Если миграция упадёт, gather пробросит ошибку и бот завершится
+        await asyncio.gather(prepare_db(), dp.start_polling(bot))
+    finally:
+        if backup_task is not None:
+            backup_task.cancel()
+        profile.clear_ready()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,84 @@
+# bot/startup.py
+# Замер фаз старта бота и readiness-файл для healthcheck.
+# Модуль специально без тяжёлых импортов: bot.main импортирует его первым,
+# чтобы время импорта aiogram и остального тоже попало в отчёт.
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+_STARTED_AT = time.perf_counter()
+
+logger = logging.getLogger(__name__)
+
+# Бот считается готовым, когда база мигрирована и пошёл первый getUpdates
+READY_AFTER = ("migrate", "polling")
+
+class StartupProfile:
+    def __init__(self, ready_file: str, started_at: float = _STARTED_AT):
+        self.ready_file = ready_file
+        self.started_at = started_at
+        # phase -> {"ms": длительность, "at_ms": момент завершения от старта процесса}
+        self.phases: Dict[str, Dict[str, float]] = {}
+
+    def _since_start_ms(self, now: Optional[float] = None) -> float:
+        now = time.perf_counter() if now is None else now
+        return round((now - self.started_at) * 1000, 1)
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self.phases for name in READY_AFTER)
+
+    def point(self, name: str) -> None:
+        """
+        Отмечает момент (без длительности). Повторные отметки игнорируются.
+        """
+        if name in self.phases:
+            return
+        at_ms = self._since_start_ms()
+        self.phases[name] = {"ms": 0.0, "at_ms": at_ms}
+        logger.info("startup: %s через %.1f мс после старта", name, at_ms)
+        self._publish()
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        begin = time.perf_counter()
+        yield
+        end = time.perf_counter()
+        self.phases[name] = {
+            "ms": round((end - begin) * 1000, 1),
+            "at_ms": self._since_start_ms(end),
+        }
+        logger.info(
+            "startup: %s за %.1f мс (%.1f мс после старта)",
+            name, self.phases[name]["ms"], self.phases[name]["at_ms"]
+        )
+        self._publish()
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "phases": self.phases}
+
+    def clear_ready(self) -> None:
+        # После `restart` контейнера файловая система сохраняется,
+        # поэтому старый файл готовности нужно убрать сразу
+        if not self.ready_file:
+            return
+        try:
+            os.remove(self.ready_file)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning("Не удалось удалить %s", self.ready_file)
+
+    def _publish(self) -> None:
+        if not self.ready or not self.ready_file:
+            return
+        tmp_path = f"{self.ready_file}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False)
+            os.replace(tmp_path, self.ready_file)
+        except OSError:
+            logger.warning("Не удалось записать %s", self.ready_file)
@@ -8,3 +8,7 @@ class AddContact(StatesGroup):
     waiting_display_name = State()
     waiting_contact_value = State()
     # category_id мы будем хранить как data в FSMContext
+
+class SelectContacts(StatesGroup):
+    selecting = State()
+    # в data: category_id, cat_name, contacts ([id, name]), selected ([id])
@@ -1,7 +1,24 @@
 # bot/storage.py
-from typing import List, Tuple, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional
 from . import db
 
+# Кэш результатов inline-поиска: user_id -> {(query, offset): (expires_at, rows, has_more)}.
+# Inline-запрос прилетает на каждое нажатие клавиши, поэтому повторы и
+# уточнения уже полученного префикса отдаём из памяти, не трогая базу.
+# Пользователи хранятся в LRU-порядке: дольше всех молчавшие вытесняются первыми.
+SEARCH_PAGE_SIZE = 20
+SEARCH_CACHE_TTL = 30.0
+SEARCH_CACHE_MAX_PER_USER = 64
+SEARCH_CACHE_MAX_USERS = 1000
+
+SearchRow = Tuple[int, str, str, str]
+_search_cache: OrderedDict[int, Dict[Tuple[str, int], Tuple[float, List[SearchRow], bool]]] = OrderedDict()
+
+def _invalidate_search_cache(user_id: int) -> None:
+    _search_cache.pop(user_id, None)
+
 async def setup_user(user_id: int):
     await db.ensure_user(user_id)
 
@@ -31,6 +48,7 @@ async def remove_category(user_id: int, category_id: int) -> str:
         return "Категория не найдена."
 
     deleted = await db.delete_category(user_id, category_id)
+    _invalidate_search_cache(user_id)
     if deleted:
         return f"Категория '{cat_name}' удалена вместе со всеми её контактами 🗑️"
     else:
@@ -45,6 +63,7 @@ async def add_contact(
     contact_value: str
 ) -> str:
     await db.add_contact_in_category(category_id, display_name, contact_value)
+    _invalidate_search_cache(user_id)
     cat_name = await db.get_category_name_by_id(user_id, category_id)
     return f"Контакт '{display_name}' добавлен в '{cat_name}' ✅"
 
@@ -67,8 +86,105 @@ async def list_contacts_full(category_id: int) -> List[Tuple[str, str]]:
 
 async def remove_contact(user_id: int, category_id: int, display_name: str) -> str:
     removed = await db.remove_contact_in_category(category_id, display_name)
+    _invalidate_search_cache(user_id)
     cat_name = await db.get_category_name_by_id(user_id, category_id)
     if removed:
         return f"Контакт '{display_name}' удалён из '{cat_name}' 🗑️"
     else:
         return f"Контакт '{display_name}' не найден в '{cat_name}'."
+
+async def list_contacts_with_ids(category_id: int) -> List[Tuple[int, str, str]]:
+    return await db.list_contacts_with_ids(category_id)
+
+async def remove_contacts(
+    user_id: int,
+    category_id: int,
+    cat_name: str,
+    contact_ids: List[int]
+) -> str:
+    removed = await db.delete_contacts_bulk(user_id, category_id, contact_ids)
+    _invalidate_search_cache(user_id)
+    if removed:
+        return f"Удалено контактов из '{cat_name}': {removed} 🗑️"
+    else:
+        return f"Ничего не удалено из '{cat_name}'."
+
+async def move_contacts(
+    user_id: int,
+    from_category_id: int,
+    to_category_id: int,
+    to_cat_name: str,
+    contact_ids: List[int]
+) -> str:
+    moved = await db.move_contacts_bulk(
+        user_id, from_category_id, to_category_id, contact_ids
+    )
+    _invalidate_search_cache(user_id)
+    if moved:
+        return f"Перенесено контактов в '{to_cat_name}': {moved} 📁"
+    else:
+        return f"Ничего не перенесено в '{to_cat_name}'."
+
+# ----- Inline-поиск -----
+
+def _cached_search(user_id: int, query: str, offset: int) -> Optional[Tuple[List[SearchRow], bool]]:
+    user_cache = _search_cache.get(user_id)
+    if not user_cache:
+        return None
+    _search_cache.move_to_end(user_id)
+    now = time.monotonic()
+
+    hit = user_cache.get((query, offset))
+    if hit is not None and hit[0] > now:
+        return hit[1], hit[2]
+
+    # Запрос уточняет префикс, по которому у нас уже есть полный список —
+    # достаточно отфильтровать его в памяти
+    if offset == 0:
+        key = db.fold_name(query)
+        for (cached_query, cached_offset), (expires_at, rows, has_more) in user_cache.items():
+            if (
+                cached_offset == 0
+                and not has_more
+                and expires_at > now
+                and key.startswith(db.fold_name(cached_query))
+            ):
+                return [r for r in rows if db.fold_name(r[1]).startswith(key)], False
+    return None
+
+def _store_search(user_id: int, query: str, offset: int, rows: List[SearchRow], has_more: bool) -> None:
+    now = time.monotonic()
+    user_cache = _search_cache.setdefault(user_id, {})
+    _search_cache.move_to_end(user_id)
+
+    for key in [k for k, v in user_cache.items() if v[0] <= now]:
+        del user_cache[key]
+    if len(user_cache) >= SEARCH_CACHE_MAX_PER_USER:
+        user_cache.clear()
+    user_cache[(query, offset)] = (now + SEARCH_CACHE_TTL, rows, has_more)
+
+    while len(_search_cache) > SEARCH_CACHE_MAX_USERS:
+        _search_cache.popitem(last=False)
+
+async def search_contacts(
+    user_id: int,
+    query: str,
+    offset: int = 0
+) -> Tuple[List[SearchRow], bool]:
+    """
+    Ищет контакты пользователя по префиксу имени, страницами по SEARCH_PAGE_SIZE.
+    Возвращает (строки страницы, есть ли следующая страница).
+    """
+    query = query.strip()
+    cached = _cached_search(user_id, query, offset)
+    if cached is not None:
+        return cached
+
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    rows = await db.search_contacts_by_prefix(
+        user_id, query, SEARCH_PAGE_SIZE + 1, offset
+    )
+    has_more = len(rows) > SEARCH_PAGE_SIZE
+    rows = rows[:SEARCH_PAGE_SIZE]
+    _store_search(user_id, query, offset, rows, has_more)
+    return rows, has_more
@@ -8,5 +8,15 @@ load_dotenv()
 BOT_TOKEN = os.getenv("TG_API")
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///db.sqlite")
 
+# Бэкапы sqlite: куда складывать (пусто = папка backups рядом с базой),
+# как часто (0 = фоновая задача выключена) и сколько последних снимков хранить
+BACKUP_DIR = os.getenv("BACKUP_DIR", "")
+BACKUP_INTERVAL_MINUTES = int(os.getenv("BACKUP_INTERVAL_MINUTES", "0"))
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+
+# Файл готовности для healthcheck: появляется, когда бот реально принимает апдейты.
+# Внутри JSON с временем фаз старта. Пустая строка = не писать файл.
+READY_FILE = os.getenv("READY_FILE", "/tmp/bot.ready")
+
 if BOT_TOKEN is None:
     raise RuntimeError("TELEGRAM_BOT_TOKEN is not set. Add it to your .env file.")